@@ -1,19 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
 from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+import os
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import partial
+import threading
+# reportlab, svglib and matplotlib are only needed for the PDF report, so they
+# are imported inside the PDF functions to keep them off the dashboard's startup
 
 # Page configuration
 st.set_page_config(
@@ -25,114 +24,294 @@ st.set_page_config(
 # Title
 st.title("🛒 E-commerce Sales Analytics Dashboard")
 
-# Function to create matplotlib charts for PDF
-def create_sales_trend_chart(df, date_col, amount_col):
-    """Create sales trend chart using matplotlib"""
-    daily_sales = df.groupby(df[date_col].dt.date)[amount_col].sum().reset_index()
-    daily_sales.columns = ['Date', 'Sales']
-    
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(daily_sales['Date'], daily_sales['Sales'], color='#1f77b4', linewidth=2)
-    ax.set_xlabel('Date', fontsize=11)
-    ax.set_ylabel('Total Sales ($)', fontsize=11)
-    ax.set_title('Daily Sales Trend', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    buf.seek(0)
-    plt.close()
-    return buf
+# Function to pre-aggregate the full dataset per day and category
+def build_sales_cube(df, date_col, amount_col, category_col):
+    """Order totals ('sum') and counts ('count') per day (rows) and category (columns)"""
+    # Group on a datetime64[D] view (int64 day numbers); without a category
+    # column every order falls under a single 'All' column
+    day_key = pd.Series(df[date_col].to_numpy().astype('datetime64[D]'), index=df.index, name=date_col)
+    category_key = df[category_col] if category_col else pd.Series('All', index=df.index, name='Category')
+    # dropna=False keeps orders with a blank category in the 'All' totals;
+    # orders without a date can't be placed on a day, so those rows go
+    cube = df.groupby([day_key, category_key], observed=True, dropna=False)[amount_col].agg(['sum', 'count'])
+    cube = cube[cube.index.get_level_values(0).notna()]
+    return cube.unstack(fill_value=0)
 
-def create_top_categories_chart(df, category_col, amount_col):
-    """Create top categories chart using matplotlib"""
-    top_categories = df.groupby(category_col)[amount_col].sum().sort_values(ascending=True).tail(10)
-    
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.barh(range(len(top_categories)), top_categories.values, color='#ff7f0e')
-    ax.set_yticks(range(len(top_categories)))
-    ax.set_yticklabels(top_categories.index, fontsize=10)
-    ax.set_xlabel('Revenue ($)', fontsize=11)
-    ax.set_title('Top 10 Categories by Revenue', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3, axis='x')
-    
-    # Add value labels on bars
-    for i, v in enumerate(top_categories.values):
-        ax.text(v, i, f' ${v:,.0f}', va='center', fontsize=9)
-    
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    buf.seek(0)
-    plt.close()
-    return buf
+# Functions to aggregate the filtered data
+# These are keyed on the filter state rather than on the dataframe (leading
+# underscore), so reruns with unchanged filters skip the work entirely.
+@st.cache_data(show_spinner=False, max_entries=16)
+def compute_filtered_sales(_cube, date_bounds, selected_category):
+    """Daily, monthly ('YYYY-MM' labels) and top 10 category sales for the current filters"""
+    # Slice the pre-aggregated cube instead of re-scanning the order rows
+    cube = _cube
+    if date_bounds:
+        cube = cube.loc[pd.Timestamp(date_bounds[0]):pd.Timestamp(date_bounds[1])]
+    sums, counts = cube['sum'], cube['count']
+    if selected_category != 'All':
+        sums, counts = sums[[selected_category]], counts[[selected_category]]
+    
+    # Only days and categories that have orders, as a groupby would give
+    daily_sales = sums.sum(axis=1)[counts.sum(axis=1) > 0]
+    daily_sales = daily_sales.rename(None).rename_axis(None)
+    
+    monthly_sales = daily_sales.groupby(daily_sales.index.values.astype('datetime64[M]')).sum()
+    monthly_sales.index = pd.DatetimeIndex(monthly_sales.index).strftime('%Y-%m')
+    
+    # Blank categories count towards 'All' but aren't a category of their own
+    category_totals = sums.sum(axis=0)[counts.sum(axis=0) > 0]
+    category_totals = category_totals[category_totals.index.notna()]
+    top_categories = category_totals.nlargest(10)
+    return daily_sales, monthly_sales, top_categories
 
-def create_distribution_chart(df, amount_col):
-    """Create sales distribution chart using matplotlib"""
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.hist(df[amount_col], bins=50, color='#2ca02c', edgecolor='black', alpha=0.7)
-    ax.set_xlabel('Order Amount ($)', fontsize=11)
-    ax.set_ylabel('Frequency', fontsize=11)
-    ax.set_title('Distribution of Order Values', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    buf.seek(0)
-    plt.close()
-    return buf
+@st.cache_data(show_spinner=False, max_entries=16)
+def compute_order_value_histogram(_df, amount_col, filter_key, bins=50, trim_tails=True):
+    """Counts and bin edges of order values, optionally leaving out the 0.5% tails"""
+    # Missing amounts would make np.histogram's range NaN (and both quantiles
+    # NaN, emptying the trim mask), so they are left out like px.histogram did
+    values = _df[amount_col].to_numpy(np.float32)
+    values = values[np.isfinite(values)]
+    if trim_tails and values.size:
+        # A handful of far-tail outliers would otherwise squash the bins
+        lo, hi = np.quantile(values, [0.005, 0.995])
+        values = values[(values >= lo) & (values <= hi)]
+    return np.histogram(values, bins=bins)
 
-def create_monthly_chart(df, date_col, amount_col):
-    """Create monthly sales chart using matplotlib"""
-    df_temp = df.copy()
-    df_temp['Month'] = df_temp[date_col].dt.to_period('M').astype(str)
-    monthly_sales = df_temp.groupby('Month')[amount_col].sum().reset_index()
-    
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.bar(range(len(monthly_sales)), monthly_sales[amount_col], color='#d62728', edgecolor='black', alpha=0.7)
-    ax.set_xticks(range(len(monthly_sales)))
-    ax.set_xticklabels(monthly_sales['Month'], rotation=45, ha='right', fontsize=9)
-    ax.set_ylabel('Total Sales ($)', fontsize=11)
-    ax.set_title('Sales by Month', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3, axis='y')
-    
-    # Add value labels on bars
-    for i, v in enumerate(monthly_sales[amount_col]):
-        ax.text(i, v, f'${v:,.0f}', ha='center', va='bottom', fontsize=8)
-    
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    buf.seek(0)
-    plt.close()
-    return buf
+# Function to thin a time series before plotting
+# Not cached itself: its only caller, create_trend_figure, already is
+def downsample_lttb(series, n_out=300):
+    """Keep at most n_out points of a series using Largest-Triangle-Three-Buckets"""
+    n = len(series)
+    if n <= n_out or n_out < 3:
+        return series
+    
+    x = series.index.asi8.astype(np.float64)
+    y = series.to_numpy(np.float64)
+    # First and last points are always kept; the rest are split into buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Pick the point forming the largest triangle with the previous pick
+        # and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    
+    return series.iloc[selected]
 
-# Function to create branded PDF report
-def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_col, category_col, quantity_col, filter_info):
-    """Generate a professional branded PDF proposal with charts"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=letter, 
-        topMargin=0.5*inch, 
-        bottomMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        rightMargin=0.75*inch
+# Functions to build the dashboard's Plotly figures
+# Each is a single trace, so they are built with graph_objects directly rather
+# than Plotly Express, and cached as plain dicts keyed on the filter state
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_trend_figure(_daily_sales, filter_key):
+    """Daily sales line chart"""
+    # Cap the points sent to the browser; the PDF chart keeps every day
+    daily_sales = downsample_lttb(_daily_sales)
+    
+    fig = go.Figure(go.Scatter(
+        x=daily_sales.index.values,
+        y=daily_sales.values,
+        mode='lines',
+        line_color='#1f77b4',
+        line_width=2
+    ))
+    fig.update_layout(
+        title='Daily Sales',
+        xaxis_title='Date',
+        yaxis_title='Total Sales ($)',
+        plot_bgcolor='white'
     )
-    
-    # Container for PDF elements
-    elements = []
-    styles = getSampleStyleSheet()
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_categories_figure(_top_categories, filter_key):
+    """Horizontal bar chart of the top categories"""
+    fig = go.Figure(go.Bar(
+        x=_top_categories.values,
+        y=_top_categories.index.to_numpy(str),
+        orientation='h',
+        marker_color='#ff7f0e'
+    ))
+    fig.update_layout(
+        title='Top 10 Categories',
+        xaxis_title='Revenue ($)',
+        yaxis_title='Category',
+        plot_bgcolor='white'
+    )
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_distribution_figure(_df, amount_col, filter_key):
+    """Histogram of order values over their full range"""
+    # Bin on the server and send 50 bars instead of every order value;
+    # unlike the PDF chart this keeps the full range of orders
+    counts, edges = compute_order_value_histogram(_df, amount_col, filter_key, trim_tails=False)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#2ca02c'
+    ))
+    fig.update_layout(
+        title='Distribution of Order Values',
+        xaxis_title='Order Amount ($)',
+        yaxis_title='count',
+        bargap=0,
+        plot_bgcolor='white'
+    )
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_monthly_figure(_monthly_sales, filter_key):
+    """Bar chart of sales per month"""
+    fig = go.Figure(go.Bar(
+        x=_monthly_sales.index.to_numpy(str),
+        y=_monthly_sales.values,
+        marker_color='#d62728'
+    ))
+    fig.update_layout(
+        title='Sales by Month',
+        xaxis_title='Month',
+        yaxis_title='Total Sales ($)',
+        plot_bgcolor='white'
+    )
+    return fig.to_dict()
+
+# Function to reuse matplotlib figures between PDF builds
+@st.cache_resource
+def get_pooled_figure(key, figsize, margins):
+    """Return a (figure, axes, lock) triple shared across reruns for one chart"""
+    from matplotlib.figure import Figure  # Figures are built without pyplot so they are thread-safe
+    
+    fig = Figure(figsize=figsize)
+    # Fixed margins replace tight_layout()/bbox_inches='tight', which each cost
+    # an extra layout pass on every save
+    fig.subplots_adjust(**margins)
+    return fig, fig.add_subplot(), threading.Lock()
+
+@contextmanager
+def pooled_figure(key, figsize, margins):
+    """Yield the pooled figure for a chart with its axes cleared
+
+    Charts are rendered from worker threads and from concurrent sessions, so
+    the figure's lock is held until the caller has finished saving it.
+    """
+    fig, ax, lock = get_pooled_figure(key, figsize, margins)
+    with lock:
+        ax.clear()
+        yield fig, ax
+
+# Function to create matplotlib charts for PDF
+# Charts take the small aggregates computed once in the main script, are cached
+# on those and returned as SVG bytes.
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_sales_trend_chart(daily_sales):
+    """Create sales trend chart from a daily sales Series"""
+    margins = dict(left=0.08, right=0.97, top=0.92, bottom=0.22)
+    with pooled_figure('sales_trend', (10, 4), margins) as (fig, ax):
+        ax.plot(daily_sales.index, daily_sales.values, color='#1f77b4', linewidth=2)
+        ax.set_xlabel('Date', fontsize=11)
+        ax.set_ylabel('Total Sales ($)', fontsize=11)
+        ax.set_title('Daily Sales Trend', fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        for label in ax.get_xticklabels():
+            label.set(rotation=45, ha='right')
+        buf = BytesIO()
+        fig.savefig(buf, format='svg')
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_top_categories_chart(top_categories):
+    """Create top categories chart from a Series sorted by descending revenue"""
+    # barh draws bottom-up, so reverse to put the best category on top
+    top_categories = top_categories.iloc[::-1]
+    
+    margins = dict(left=0.1, right=0.9, top=0.93, bottom=0.1)
+    with pooled_figure('top_categories', (10, 5), margins) as (fig, ax):
+        bars = ax.barh(range(len(top_categories)), top_categories.values, color='#ff7f0e')
+        ax.set_yticks(range(len(top_categories)))
+        ax.set_yticklabels(top_categories.index, fontsize=10)
+        ax.set_xlabel('Revenue ($)', fontsize=11)
+        ax.set_title('Top 10 Categories by Revenue', fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='x')
+        
+        # Add value labels on bars
+        ax.bar_label(bars, labels=[f'${v:,.0f}' for v in top_categories.values], padding=2, fontsize=9)
+        
+        buf = BytesIO()
+        fig.savefig(buf, format='svg')
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_distribution_chart(counts, edges):
+    """Create sales distribution chart from pre-binned histogram counts"""
+    from matplotlib.colors import to_rgba  # svglib honours fill-opacity but not opacity
+    
+    margins = dict(left=0.08, right=0.97, top=0.92, bottom=0.13)
+    with pooled_figure('sales_distribution', (10, 4), margins) as (fig, ax):
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=to_rgba('#2ca02c', 0.7), edgecolor=to_rgba('black', 0.7))
+        ax.set_xlabel('Order Amount ($)', fontsize=11)
+        ax.set_ylabel('Frequency', fontsize=11)
+        ax.set_title('Distribution of Order Values', fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y')
+        buf = BytesIO()
+        fig.savefig(buf, format='svg')
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_monthly_chart(monthly_sales):
+    """Create monthly sales chart from a Series indexed by 'YYYY-MM' labels"""
+    from matplotlib.colors import to_rgba
+    
+    margins = dict(left=0.08, right=0.97, top=0.9, bottom=0.15)
+    with pooled_figure('monthly_sales', (10, 4), margins) as (fig, ax):
+        bars = ax.bar(range(len(monthly_sales)), monthly_sales.values, color=to_rgba('#d62728', 0.7), edgecolor=to_rgba('black', 0.7))
+        ax.set_xticks(range(len(monthly_sales)))
+        ax.set_xticklabels(monthly_sales.index, rotation=45, ha='right', fontsize=9)
+        ax.set_ylabel('Total Sales ($)', fontsize=11)
+        ax.set_title('Sales by Month', fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y')
+        
+        # Add value labels on bars
+        ax.bar_label(bars, fmt='${:,.0f}', fontsize=8)
+        
+        buf = BytesIO()
+        fig.savefig(buf, format='svg')
+    return buf.getvalue()
+
+# Function to embed an SVG chart in the PDF as vector graphics
+def create_chart_drawing(svg_bytes, width, height):
+    """Convert SVG chart bytes into a reportlab Drawing scaled to width x height"""
+    from svglib.svglib import svg2rlg
+    
+    drawing = svg2rlg(BytesIO(svg_bytes))
+    drawing.scale(width / drawing.width, height / drawing.height)
+    drawing.width, drawing.height = width, height
+    return drawing
+
+# Function to build the PDF styles once
+@st.cache_resource
+def get_pdf_styles():
+    """Paragraph and table styles shared by every generated report"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    
+    sample = getSampleStyleSheet()
+    styles = {'normal': sample['Normal']}
     
     # Custom styles for branding
-    title_style = ParagraphStyle(
+    styles['title'] = ParagraphStyle(
         'BrandTitle',
-        parent=styles['Heading1'],
+        parent=sample['Heading1'],
         fontSize=28,
         textColor=colors.HexColor('#1f77b4'),
         spaceAfter=6,
@@ -140,9 +319,9 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
         fontName='Helvetica-Bold'
     )
     
-    subtitle_style = ParagraphStyle(
+    styles['subtitle'] = ParagraphStyle(
         'BrandSubtitle',
-        parent=styles['Normal'],
+        parent=sample['Normal'],
         fontSize=14,
         textColor=colors.HexColor('#666666'),
         spaceAfter=30,
@@ -150,9 +329,9 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
         fontName='Helvetica'
     )
     
-    heading_style = ParagraphStyle(
+    styles['heading'] = ParagraphStyle(
         'SectionHeading',
-        parent=styles['Heading2'],
+        parent=sample['Heading2'],
         fontSize=16,
         textColor=colors.HexColor('#1f77b4'),
         spaceAfter=12,
@@ -164,20 +343,117 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
         backColor=colors.HexColor('#f0f8ff')
     )
     
-    # ==================== COVER PAGE ====================
-    elements.append(Spacer(1, 1.5*inch))
+    styles['footer'] = ParagraphStyle(
+        'Footer',
+        parent=sample['Normal'],
+        fontSize=9,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    )
+    
+    styles['info_table'] = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8e8e8')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('PADDING', (0, 0), (-1, -1), 10),
+    ])
     
-    # Company branding header
-    brand_box_data = [[Paragraph("E-COMMERCE ANALYTICS", title_style)]]
-    brand_box = Table(brand_box_data, colWidths=[6.5*inch])
-    brand_box.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#1f77b4')),
-        ('PADDING', (0, 0), (-1, -1), 20),
+    styles['kpi_table'] = TableStyle([
+        # Headers
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+        ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#1f77b4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('TEXTCOLOR', (0, 2), (-1, 2), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('FONTSIZE', (0, 2), (-1, 2), 11),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    elements.append(brand_box)
-    elements.append(Spacer(1, 0.5*inch))
+        # Values
+        ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#e6f2ff')),
+        ('BACKGROUND', (0, 3), (-1, 3), colors.HexColor('#e6f2ff')),
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 3), (-1, 3), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, 1), 18),
+        ('FONTSIZE', (0, 3), (-1, 3), 18),
+        ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1f77b4')),
+        ('TEXTCOLOR', (0, 3), (-1, 3), colors.HexColor('#1f77b4')),
+        ('PADDING', (0, 0), (-1, -1), 15),
+        ('GRID', (0, 0), (-1, -1), 2, colors.HexColor('#1f77b4')),
+    ])
+    
+    styles['category_table'] = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff7f0e')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('PADDING', (0, 1), (-1, -1), 8),
+    ])
+    
+    return styles
+
+# Function to draw the cover page banner straight onto the canvas
+def draw_cover_banner(canvas, doc):
+    """Paint the brand banner on the first page without a table flowable"""
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    
+    width, height = 6.5*inch, 1*inch
+    x = (doc.pagesize[0] - width) / 2
+    y = doc.pagesize[1] - doc.topMargin - 1.5*inch - height
+    
+    canvas.saveState()
+    canvas.setFillColor(colors.HexColor('#1f77b4'))
+    canvas.rect(x, y, width, height, stroke=0, fill=1)
+    canvas.setFillColor(colors.white)
+    canvas.setFont('Helvetica-Bold', 28)
+    canvas.drawCentredString(x + width / 2, y + height / 2 - 10, "E-COMMERCE ANALYTICS")
+    canvas.restoreState()
+
+# Function to create branded PDF report
+def create_branded_pdf_report(top_categories, metrics_data, charts_data, date_col, amount_col, category_col, quantity_col, filter_info):
+    """Generate a professional branded PDF proposal with charts"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak
+    
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=letter, 
+        topMargin=0.5*inch, 
+        bottomMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        rightMargin=0.75*inch
+    )
+    
+    # Container for PDF elements
+    elements = []
+    styles = get_pdf_styles()
+    title_style = styles['title']
+    subtitle_style = styles['subtitle']
+    heading_style = styles['heading']
+    
+    # ==================== COVER PAGE ====================
+    elements.append(Spacer(1, 1.5*inch))
+    
+    # Room for the company branding header painted by draw_cover_banner
+    elements.append(Spacer(1, 1.5*inch))
     
     # Title
     title = Paragraph("Sales Performance Proposal", title_style)
@@ -197,17 +473,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     ]
     
     info_table = Table(report_info, colWidths=[2*inch, 4*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8e8e8')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('PADDING', (0, 0), (-1, -1), 10),
-    ]))
+    info_table.setStyle(styles['info_table'])
     elements.append(info_table)
     
     elements.append(PageBreak())
@@ -251,7 +517,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     </para>
     """
     
-    assumptions_para = Paragraph(assumptions_text, styles['Normal'])
+    assumptions_para = Paragraph(assumptions_text, styles['normal'])
     elements.append(assumptions_para)
     
     elements.append(PageBreak())
@@ -269,30 +535,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     ]
     
     kpi_table = Table(kpi_data, colWidths=[3.25*inch, 3.25*inch])
-    kpi_table.setStyle(TableStyle([
-        # Headers
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-        ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('TEXTCOLOR', (0, 2), (-1, 2), colors.whitesmoke),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('FONTSIZE', (0, 2), (-1, 2), 11),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        # Values
-        ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#e6f2ff')),
-        ('BACKGROUND', (0, 3), (-1, 3), colors.HexColor('#e6f2ff')),
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 3), (-1, 3), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (-1, 1), 18),
-        ('FONTSIZE', (0, 3), (-1, 3), 18),
-        ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 3), (-1, 3), colors.HexColor('#1f77b4')),
-        ('PADDING', (0, 0), (-1, -1), 15),
-        ('GRID', (0, 0), (-1, -1), 2, colors.HexColor('#1f77b4')),
-    ]))
+    kpi_table.setStyle(styles['kpi_table'])
     elements.append(kpi_table)
     
     elements.append(PageBreak())
@@ -302,7 +545,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     elements.append(Spacer(1, 0.2*inch))
     
     if 'sales_trend' in charts_data and charts_data['sales_trend']:
-        img_sales = Image(charts_data['sales_trend'], width=6.5*inch, height=3*inch)
+        img_sales = create_chart_drawing(charts_data['sales_trend'], 6.5*inch, 3*inch)
         elements.append(img_sales)
         elements.append(Spacer(1, 0.2*inch))
     
@@ -310,7 +553,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     elements.append(Spacer(1, 0.2*inch))
     
     if 'top_categories' in charts_data and charts_data['top_categories']:
-        img_categories = Image(charts_data['top_categories'], width=6.5*inch, height=3.5*inch)
+        img_categories = create_chart_drawing(charts_data['top_categories'], 6.5*inch, 3.5*inch)
         elements.append(img_categories)
     
     elements.append(PageBreak())
@@ -320,7 +563,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     elements.append(Spacer(1, 0.2*inch))
     
     if 'sales_distribution' in charts_data and charts_data['sales_distribution']:
-        img_dist = Image(charts_data['sales_distribution'], width=6.5*inch, height=3*inch)
+        img_dist = create_chart_drawing(charts_data['sales_distribution'], 6.5*inch, 3*inch)
         elements.append(img_dist)
         elements.append(Spacer(1, 0.2*inch))
     
@@ -328,7 +571,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     elements.append(Spacer(1, 0.2*inch))
     
     if 'monthly_sales' in charts_data and charts_data['monthly_sales']:
-        img_monthly = Image(charts_data['monthly_sales'], width=6.5*inch, height=3*inch)
+        img_monthly = create_chart_drawing(charts_data['monthly_sales'], 6.5*inch, 3*inch)
         elements.append(img_monthly)
     
     elements.append(PageBreak())
@@ -337,9 +580,7 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     elements.append(Paragraph("Top 10 Categories - Detailed Breakdown", heading_style))
     elements.append(Spacer(1, 0.2*inch))
     
-    if category_col and amount_col:
-        top_categories = df.groupby(category_col)[amount_col].sum().sort_values(ascending=False).head(10)
-        
+    if top_categories is not None:
         category_data = [['Rank', 'Category', 'Revenue', '% of Total']]
         total_revenue = top_categories.sum()
         
@@ -353,34 +594,12 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
             ])
         
         category_table = Table(category_data, colWidths=[0.6*inch, 3*inch, 1.8*inch, 1.1*inch])
-        category_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff7f0e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('PADDING', (0, 1), (-1, -1), 8),
-        ]))
+        category_table.setStyle(styles['category_table'])
         
         elements.append(category_table)
     
     # ==================== FOOTER ====================
     elements.append(Spacer(1, 0.5*inch))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
     footer_text = f"""
     <para alignment="center">
     ──────────────────────────────────────────────────────────────<br/>
@@ -390,38 +609,193 @@ def create_branded_pdf_report(df, metrics_data, charts_data, date_col, amount_co
     © {datetime.now().year} E-commerce Analytics. All rights reserved.
     </para>
     """
-    elements.append(Paragraph(footer_text, footer_style))
+    elements.append(Paragraph(footer_text, styles['footer']))
     
     # Build PDF
-    doc.build(elements)
+    doc.build(elements, onFirstPage=draw_cover_banner)
     buffer.seek(0)
     return buffer
 
+# Function to export data as CSV
+# Keyed on the filter state like the aggregates, so the export is encoded once
+# per filter combination instead of on every rerun
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_csv_bytes(_df, filter_key):
+    """Serialize a dataframe to CSV bytes with pyarrow's C++ writer"""
+    table = pa.Table.from_pandas(_df, preserve_index=False)
+    
+    # Write date-only timestamp columns as plain dates, like DataFrame.to_csv does
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            dates = table.column(i).cast(pa.date32())
+            if dates.cast(field.type).equals(table.column(i)):
+                table = table.set_column(i, field.name, dates)
+    
+    buf = BytesIO()
+    pacsv.write_csv(table, buf)
+    return buf.getvalue()
+
+# Function to render the PDF report controls
+# A fragment, so clicking "Generate PDF Report" reruns only this section instead
+# of the whole dashboard
+@st.fragment
+def render_pdf_section(df, daily_sales, monthly_sales, top_categories, metrics_data,
+                       date_col, amount_col, category_col, quantity_col, filter_info, filter_key):
+    """Generate the PDF report on request and offer it for download"""
+    # Building the PDF is by far the most expensive step, so it only runs on
+    # request instead of on every rerun
+    if st.button("📑 Generate PDF Report"):
+        with st.spinner('Generating PDF proposal with charts...'):
+            try:
+                chart_tasks = {}
+                
+                # Generate matplotlib charts for PDF
+                if date_col and amount_col:
+                    chart_tasks['sales_trend'] = (create_sales_trend_chart, daily_sales)
+                
+                if category_col and amount_col:
+                    chart_tasks['top_categories'] = (create_top_categories_chart, top_categories)
+                
+                if amount_col:
+                    # Only the PDF uses the trimmed histogram, so it is binned here on
+                    # the pool alongside the other charts rather than on every rerun
+                    chart_tasks['sales_distribution'] = (
+                        lambda: create_distribution_chart(*compute_order_value_histogram(df, amount_col, filter_key)),
+                    )
+                
+                if date_col and amount_col:
+                    chart_tasks['monthly_sales'] = (create_monthly_chart, monthly_sales)
+                
+                # Import matplotlib before fanning out: first-time imports racing
+                # across worker threads can see partially initialised modules
+                import matplotlib.figure, matplotlib.colors  # noqa: F401
+                
+                # The charts are independent, so render them concurrently
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    futures = {name: executor.submit(*task) for name, task in chart_tasks.items()}
+                    charts_data = {name: future.result() for name, future in futures.items()}
+                
+                pdf_buffer = create_branded_pdf_report(
+                    top_categories, metrics_data, charts_data, date_col, 
+                    amount_col, category_col, quantity_col, filter_info
+                )
+                
+                st.session_state['pdf'] = pdf_buffer.getvalue()
+                st.session_state['pdf_filter_key'] = filter_key
+                
+                st.success("✅ PDF generated successfully!")
+                
+            except Exception as e:
+                st.error(f"Error generating PDF: {str(e)}")
+                st.info("""
+                **Required packages:**
+                ```
+                pip install reportlab matplotlib svglib
+                ```
+                """)
+    
+    # Only offer a previously generated report while it matches the filters
+    if st.session_state.get('pdf_filter_key') == filter_key:
+        st.download_button(
+            label="📑 Download Proposal (PDF)",
+            data=st.session_state['pdf'],
+            file_name=f'sales_proposal_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf',
+            mime='application/pdf',
+            type='primary',
+            on_click='ignore'
+        )
+
 # Load data with caching
 @st.cache_data
 def load_data():
-    df = pd.read_csv('Ecommerce_Sales_Data_2024_2025.csv')
-    
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-    elif 'Order Date' in df.columns:
-        df['Order Date'] = pd.to_datetime(df['Order Date'])
-    
-    return df
+    csv_path = 'Ecommerce_Sales_Data_2024_2025.csv'
+    parquet_path = 'Ecommerce_Sales_Data_2024_2025.parquet'
+    
+    # Convert the CSV to Parquet once; later cold starts read the typed
+    # columnar file and skip text parsing altogether. A CSV that is newer
+    # than the Parquet copy (e.g. a monthly refresh) triggers a rebuild.
+    if (not os.path.exists(parquet_path)
+            or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path)):
+        # Read the header first so dates and dtypes can be handled by the parser
+        # itself instead of converting columns after the fact
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        parse_dates = [col for col in ['Date', 'Order Date'] if col in columns]
+        dtype = {col: 'category' for col in ['Category', 'Product Category', 'Item Category'] if col in columns}
+        df = pd.read_csv(csv_path, parse_dates=parse_dates, dtype=dtype, engine='pyarrow')
+        
+        # Shrink integer columns to the smallest type that holds their values.
+        # Float amounts are left as float64: sales totals run to hundreds of
+        # millions, where float32 would no longer keep the cents exact.
+        int_cols = df.select_dtypes('integer').columns
+        df[int_cols] = df[int_cols].apply(pd.to_numeric, downcast='integer')
+        
+        # Write to a temporary file and swap it in, so an interrupted write never
+        # leaves a truncated cache behind. The cache is only an optimisation: if
+        # it can't be written (e.g. a read-only directory) the parsed frame is used.
+        root, ext = os.path.splitext(parquet_path)
+        tmp_path = f'{root}.{os.getpid()}.tmp{ext}'  # still matched by *.parquet in .gitignore
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, parquet_path)
+        except OSError:
+            with suppress(OSError):
+                os.remove(tmp_path)
+    else:
+        df = pd.read_parquet(parquet_path)
+    
+    # Probe the column layout and filter bounds once here, so reruns
+    # triggered by widget changes read them instead of rescanning df
+    def first_present(candidates):
+        return next((col for col in candidates if col in df.columns), None)
+    
+    schema = {
+        'date_col': first_present(['Date', 'Order Date']),
+        'amount_col': first_present(['Amount', 'Sales', 'Total', 'Revenue', 'Price']),
+        'category_col': first_present(['Category', 'Product Category', 'Item Category']),
+        'quantity_col': first_present(['Quantity', 'Qty', 'Units']),
+        'min_date': None,
+        'max_date': None,
+        'categories': [],
+    }
+    
+    if schema['date_col']:
+        # Undated orders fall outside every date range, so drop them once here;
+        # the default full-range view then covers the same rows as an explicit
+        # selection. Rows stay in date order so the filter can slice, not mask.
+        df = df.dropna(subset=[schema['date_col']])
+        df = df.sort_values(schema['date_col'], kind='stable', ignore_index=True)
+        schema['min_date'] = df[schema['date_col']].min()
+        schema['max_date'] = df[schema['date_col']].max()
+    
+    if schema['category_col']:
+        # The column is categorical, so its categories already are the distinct
+        # labels; no hashing pass over the rows is needed to list them
+        schema['categories'] = df[schema['category_col']].cat.categories.sort_values().tolist()
+    
+    # Per-day, per-category totals over every order; filters slice this
+    # small frame instead of aggregating the rows again
+    sales_cube = None
+    if schema['date_col'] and schema['amount_col']:
+        sales_cube = build_sales_cube(df, schema['date_col'], schema['amount_col'], schema['category_col'])
+    
+    return df, schema, sales_cube
 
 try:
-    df = load_data()
+    df, schema, sales_cube = load_data()
+    date_col = schema['date_col']
+    amount_col = schema['amount_col']
+    category_col = schema['category_col']
+    quantity_col = schema['quantity_col']
     
     # Sidebar filters
     st.sidebar.header("Filters")
     
-    date_col = 'Date' if 'Date' in df.columns else ('Order Date' if 'Order Date' in df.columns else None)
-    
     filter_info = {}
+    date_bounds = None
     
     if date_col:
-        min_date = df[date_col].min()
-        max_date = df[date_col].max()
+        min_date = schema['min_date']
+        max_date = schema['max_date']
         
         date_range = st.sidebar.date_input(
             "Select Date Range",
@@ -431,51 +805,49 @@ try:
         )
         
         if len(date_range) == 2:
-            df = df[(df[date_col] >= pd.to_datetime(date_range[0])) & 
-                   (df[date_col] <= pd.to_datetime(date_range[1]))]
+            # The default full range keeps every row, so only slice when narrowed
+            if tuple(date_range) != (min_date.date(), max_date.date()):
+                # Rows are sorted by date, so the range is a contiguous slice. The
+                # end day is included in full, matching the day-level sales cube.
+                dates = df[date_col].to_numpy()
+                lo = np.searchsorted(dates, np.datetime64(date_range[0]), side='left')
+                hi = np.searchsorted(dates, np.datetime64(date_range[1]) + np.timedelta64(1, 'D'), side='left')
+                df = df.iloc[lo:hi]
+                date_bounds = tuple(date_range)
             filter_info['date_range'] = f"{date_range[0]} to {date_range[1]}"
         else:
             filter_info['date_range'] = "All Dates"
     
-    category_col = None
-    for col in ['Category', 'Product Category', 'Item Category']:
-        if col in df.columns:
-            category_col = col
-            break
-    
     selected_category = 'All'
     if category_col:
-        categories = ['All'] + sorted(df[category_col].unique().tolist())
+        categories = ['All'] + schema['categories']
         selected_category = st.sidebar.selectbox("Select Category", categories)
         
         if selected_category != 'All':
-            df = df[df[category_col] == selected_category]
+            # Compare the categorical's integer codes rather than the labels
+            categorical = df[category_col].cat
+            code = categorical.categories.get_loc(selected_category)
+            df = df.iloc[categorical.codes.to_numpy() == code]
         filter_info['category'] = selected_category
     
     filter_info['total_records'] = f"{len(df):,}"
     
+    # Hashable fingerprint of the current filter state, used to key the cached
+    # aggregates and charts that read the raw rows
+    filter_key = (filter_info.get('date_range'), selected_category)
+    
     # Key Metrics
     st.header("📊 Key Performance Indicators")
     
     col1, col2, col3, col4 = st.columns(4)
     
-    amount_col = None
-    for col in ['Amount', 'Sales', 'Total', 'Revenue', 'Price']:
-        if col in df.columns:
-            amount_col = col
-            break
-    
-    quantity_col = None
-    for col in ['Quantity', 'Qty', 'Units']:
-        if col in df.columns:
-            quantity_col = col
-            break
-    
     metrics_data = {}
     
     if amount_col:
+        # The mean reuses the total instead of summing the column a second time
         total_sales = df[amount_col].sum()
-        avg_order_value = df[amount_col].mean()
+        order_count = df[amount_col].count()
+        avg_order_value = total_sales / order_count if order_count else float('nan')
         col1.metric("Total Sales", f"${total_sales:,.2f}")
         col2.metric("Avg Order Value", f"${avg_order_value:,.2f}")
         metrics_data['total_sales'] = f"${total_sales:,.2f}"
@@ -491,6 +863,18 @@ try:
     else:
         metrics_data['total_units'] = "N/A"
     
+    # Aggregate once; the dashboard charts, PDF charts and PDF table all reuse these
+    daily_sales = monthly_sales = top_categories = None
+    if sales_cube is not None:
+        daily_sales, monthly_sales, top_categories = compute_filtered_sales(
+            sales_cube, date_bounds, selected_category
+        )
+        if not category_col:
+            top_categories = None
+    elif category_col and amount_col:
+        # Without a date column there is no cube; total the filtered rows directly
+        top_categories = df.groupby(category_col, observed=True, sort=False)[amount_col].sum().nlargest(10)
+    
     # Main Dashboard Area
     row1_col1, row1_col2 = st.columns(2)
     
@@ -498,28 +882,14 @@ try:
     if date_col and amount_col:
         with row1_col1:
             st.subheader("📈 Sales Trend Over Time")
-            daily_sales = df.groupby(df[date_col].dt.date)[amount_col].sum().reset_index()
-            daily_sales.columns = ['Date', 'Sales']
-            
-            fig_trend = px.line(daily_sales, x='Date', y='Sales', 
-                         title='Daily Sales',
-                         labels={'Sales': 'Total Sales ($)'})
-            fig_trend.update_traces(line_color='#1f77b4', line_width=2)
-            fig_trend.update_layout(plot_bgcolor='white')
+            fig_trend = create_trend_figure(daily_sales, filter_key)
             st.plotly_chart(fig_trend, use_container_width=True)
     
     # Top Products/Categories
     if category_col and amount_col:
         with row1_col2:
             st.subheader("🏆 Top Categories by Revenue")
-            top_categories = df.groupby(category_col)[amount_col].sum().sort_values(ascending=False).head(10)
-            
-            fig_categories = px.bar(x=top_categories.values, y=top_categories.index, 
-                        orientation='h',
-                        labels={'x': 'Revenue ($)', 'y': 'Category'},
-                        title='Top 10 Categories')
-            fig_categories.update_traces(marker_color='#ff7f0e')
-            fig_categories.update_layout(plot_bgcolor='white')
+            fig_categories = create_categories_figure(top_categories, filter_key)
             st.plotly_chart(fig_categories, use_container_width=True)
     
     row2_col1, row2_col2 = st.columns(2)
@@ -528,30 +898,23 @@ try:
     if amount_col:
         with row2_col1:
             st.subheader("💰 Sales Distribution")
-            fig_dist = px.histogram(df, x=amount_col, nbins=50,
-                             labels={amount_col: 'Order Amount ($)'},
-                             title='Distribution of Order Values')
-            fig_dist.update_traces(marker_color='#2ca02c')
-            fig_dist.update_layout(plot_bgcolor='white')
+            fig_dist = create_distribution_figure(df, amount_col, filter_key)
             st.plotly_chart(fig_dist, use_container_width=True)
     
     # Monthly Sales Comparison
     if date_col and amount_col:
         with row2_col2:
             st.subheader("📅 Monthly Sales Comparison")
-            df['Month'] = df[date_col].dt.to_period('M').astype(str)
-            monthly_sales = df.groupby('Month')[amount_col].sum().reset_index()
-            
-            fig_monthly = px.bar(monthly_sales, x='Month', y=amount_col,
-                        title='Sales by Month',
-                        labels={amount_col: 'Total Sales ($)'})
-            fig_monthly.update_traces(marker_color='#d62728')
-            fig_monthly.update_layout(plot_bgcolor='white')
+            fig_monthly = create_monthly_figure(monthly_sales, filter_key)
             st.plotly_chart(fig_monthly, use_container_width=True)
     
     # Data Table
     st.header("📋 Detailed Data View")
-    st.dataframe(df.head(100), use_container_width=True)
+    # Only send the columns the dashboard works with, or every column if none of
+    # them were detected; the CSV export always keeps all of them
+    display_cols = [col for col in [date_col, category_col, amount_col, quantity_col] if col]
+    preview = df.head(100)
+    st.dataframe(preview[display_cols] if display_cols else preview, use_container_width=True)
     
     # Download buttons
     st.header("📥 Download Options")
@@ -561,52 +924,18 @@ try:
     with col_csv:
         st.download_button(
             label="📄 Download Data as CSV",
-            data=df.to_csv(index=False).encode('utf-8'),
+            # Encoded only when clicked; the cache makes repeat downloads free
+            data=partial(create_csv_bytes, df, filter_key),
             file_name=f'sales_data_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
             mime='text/csv',
+            on_click='ignore',
         )
     
     with col_pdf:
-        with st.spinner('Generating PDF proposal with charts...'):
-            try:
-                charts_data = {}
-                
-                # Generate matplotlib charts for PDF
-                if date_col and amount_col:
-                    charts_data['sales_trend'] = create_sales_trend_chart(df, date_col, amount_col)
-                
-                if category_col and amount_col:
-                    charts_data['top_categories'] = create_top_categories_chart(df, category_col, amount_col)
-                
-                if amount_col:
-                    charts_data['sales_distribution'] = create_distribution_chart(df, amount_col)
-                
-                if date_col and amount_col:
-                    charts_data['monthly_sales'] = create_monthly_chart(df, date_col, amount_col)
-                
-                pdf_buffer = create_branded_pdf_report(
-                    df, metrics_data, charts_data, date_col, 
-                    amount_col, category_col, quantity_col, filter_info
-                )
-                
-                st.download_button(
-                    label="📑 Download Proposal (PDF)",
-                    data=pdf_buffer,
-                    file_name=f'sales_proposal_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf',
-                    mime='application/pdf',
-                    type='primary'
-                )
-                
-                st.success("✅ PDF generated successfully!")
-                
-            except Exception as e:
-                st.error(f"Error generating PDF: {str(e)}")
-                st.info("""
-                **Required packages:**
-                ```
-                pip install reportlab matplotlib
-                ```
-                """)
+        render_pdf_section(
+            df, daily_sales, monthly_sales, top_categories, metrics_data,
+            date_col, amount_col, category_col, quantity_col, filter_info, filter_key
+        )
     
 except FileNotFoundError:
     st.error("⚠️ Dataset not found! Please make sure 'Ecommerce_Sales_Data_2024_2025.csv' is in the same directory.")
@@ -19,13 +19,14 @@ st.title("🛒 E-commerce Sales Analytics Dashboard")
 @st.cache_data
 def load_data():
     # Update this path to where your CSV file is located
-    df = pd.read_csv('Ecommerce_Sales_Data_2024_2025.csv')
+    csv_path = 'Ecommerce_Sales_Data_2024_2025.csv'
     
-    # Convert date column to datetime (adjust column name as needed)
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-    elif 'Order Date' in df.columns:
-        df['Order Date'] = pd.to_datetime(df['Order Date'])
+    # Read the header first so the parser can convert the date column and
+    # store categories as integer codes (adjust column names as needed)
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    parse_dates = [col for col in ['Date', 'Order Date'] if col in columns][:1]
+    dtype = {col: 'category' for col in ['Category', 'Product Category', 'Item Category'] if col in columns}
+    df = pd.read_csv(csv_path, parse_dates=parse_dates, dtype=dtype, engine='pyarrow')
     
     return df
 
@@ -61,7 +62,9 @@ try:
             break
     
     if category_col:
-        categories = ['All'] + sorted(df[category_col].unique().tolist())
+        # Only offer categories that have orders in the selected date range
+        observed = df[category_col].cat.remove_unused_categories().cat.categories
+        categories = ['All'] + observed.sort_values().tolist()
         selected_category = st.sidebar.selectbox("Select Category", categories)
         
         if selected_category != 'All':
@@ -104,7 +107,10 @@ try:
     if date_col and amount_col:
         with row1_col1:
             st.subheader("📈 Sales Trend Over Time")
-            daily_sales = df.groupby(df[date_col].dt.date)[amount_col].sum().reset_index()
+            # Group on a datetime64[D] view (int64 day numbers) instead of
+            # .dt.date, which creates and hashes a Python date object per row
+            day_key = df[date_col].values.astype('datetime64[D]')
+            daily_sales = df.groupby(day_key, sort=True)[amount_col].sum().reset_index()
             daily_sales.columns = ['Date', 'Sales']
             
             fig = px.line(daily_sales, x='Date', y='Sales', 
@@ -117,7 +123,7 @@ try:
     if category_col and amount_col:
         with row1_col2:
             st.subheader("🏆 Top Categories by Revenue")
-            top_categories = df.groupby(category_col)[amount_col].sum().sort_values(ascending=False).head(10)
+            top_categories = df.groupby(category_col, observed=True)[amount_col].sum().sort_values(ascending=False).head(10)
             
             fig = px.bar(x=top_categories.values, y=top_categories.index, 
                         orientation='h',
@@ -142,8 +148,12 @@ try:
     if date_col and amount_col:
         with row2_col2:
             st.subheader("📅 Monthly Sales Comparison")
-            df['Month'] = df[date_col].dt.to_period('M').astype(str)
-            monthly_sales = df.groupby('Month')[amount_col].sum().reset_index()
+            # Group on a datetime64[M] view (int64 month numbers) rather than
+            # Period objects, and only format the few resulting months as labels
+            month_key = df[date_col].values.astype('datetime64[M]')
+            monthly_sales = df.groupby(month_key, sort=True)[amount_col].sum()
+            monthly_sales.index = pd.DatetimeIndex(monthly_sales.index).strftime('%Y-%m')
+            monthly_sales = monthly_sales.rename_axis('Month').reset_index()
             
             fig = px.bar(monthly_sales, x='Month', y=amount_col,
                         title='Sales by Month',
@@ -153,12 +163,17 @@ try:
     
     # Data Table
     st.header("📋 Detailed Data View")
-    st.dataframe(df.head(100), use_container_width=True)
+    # Only send the columns the dashboard works with, or every column if none of
+    # them were detected; the CSV download always keeps all of them
+    display_cols = [col for col in [date_col, category_col, amount_col, quantity_col] if col]
+    preview = df.head(100)
+    st.dataframe(preview[display_cols] if display_cols else preview, use_container_width=True)
     
     # Download filtered data
+    # A callable is only run when the button is clicked, not on every rerun
     st.download_button(
         label="Download Filtered Data as CSV",
-        data=df.to_csv(index=False).encode('utf-8'),
+        data=lambda: df.to_csv(index=False).encode('utf-8'),
         file_name='filtered_sales_data.csv',
         mime='text/csv',
     )